@@ -3,7 +3,15 @@ import logging.handlers
 import time
 
 # allow high level import, i.e. job_pool.JobPool instead of job_pool.job_pool.JobPool
-from .job_pool import JobPool, AbnormalPoolTerminationError
+from .job_pool import (
+    JobPool,
+    AbnormalPoolTerminationError,
+    BatchingQueueHandler,
+    BatchingQueueListener,
+    SharedRef,
+    register_function,
+    register_shared,
+)
 
 # get version number
 __version__ = "0.0.0"
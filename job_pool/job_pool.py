@@ -1,10 +1,18 @@
-from threadpoolctl import threadpool_limits
+import atexit
+import functools
+from collections import deque
+import os
+import selectors
+import socket
 import time
 import signal
-from typing import Optional
+import threading
+from typing import Callable, Optional
 import warnings
 import logging
 from logging.handlers import QueueHandler, QueueListener
+import multiprocessing.connection
+import multiprocessing.context
 import multiprocessing.pool
 
 from tqdm import tqdm
@@ -26,26 +34,219 @@ class NoDaemonProcess(multiprocessing.Process):
     daemon = property(_get_daemon, _set_daemon)
 
 
+# Each start method (fork/spawn/forkserver) has its own Process class, so a
+# non-daemonic subclass is derived per context instead of hardcoding the
+# default context's multiprocessing.Process. The subclasses are created at
+# module scope because spawned workers pickle their class by reference.
+_no_daemon_classes = {}
+for _process_class_name in ("ForkProcess", "SpawnProcess", "ForkServerProcess"):
+    if hasattr(multiprocessing.context, _process_class_name):
+        _process_class = getattr(multiprocessing.context, _process_class_name)
+        _no_daemon_class = type(
+            "NoDaemon" + _process_class_name,
+            (_process_class,),
+            {
+                "daemon": property(
+                    NoDaemonProcess._get_daemon, NoDaemonProcess._set_daemon
+                )
+            },
+        )
+        globals()[_no_daemon_class.__name__] = _no_daemon_class
+        _no_daemon_classes[_process_class] = _no_daemon_class
+        del _process_class, _no_daemon_class
+del _process_class_name
+
+
 # We sub-class multiprocessing.pool.Pool instead of multiprocessing.Pool
 # because the latter is only a wrapper function, not a proper class.
 # https://stackoverflow.com/questions/6974695/python-process-pool-non-daemonic#54304172
 class NestablePool(multiprocessing.pool.Pool):
     def __init__(self, *args, **kwargs):
-        self.processes = []
+        self._live_procs = set()
+        self._registered_procs = set()
+        # on Windows the default selector is select-based and only accepts
+        # sockets, not process sentinel HANDLEs; connection.wait is used there
+        self._selector = selectors.DefaultSelector() if os.name == "posix" else None
         super().__init__(*args, **kwargs)
 
     def Process(self, *args, **kwds):
         proc = super(NestablePool, self).Process(*args, **kwds)
-        proc.__class__ = NoDaemonProcess
+        proc.__class__ = _no_daemon_classes.get(type(proc), NoDaemonProcess)
 
-        self.processes.append(proc)
+        self._live_procs.add(proc)
         return proc
 
     def check_for_terminated_processes(self):
-        for proc in self.processes:
-            if proc.exitcode:
+        """Returns the first worker that exited with a non-zero exitcode, if any.
+
+        Worker sentinels are watched through a selector, so a call costs a
+        single poll syscall regardless of the number of live workers, instead
+        of one waitpid per worker; only workers whose sentinel fired need
+        their exitcode resolved. Workers that exited cleanly (e.g. due to
+        maxtasksperchild) are pruned from the tracking sets. On Windows the
+        sentinels are polled through multiprocessing.connection.wait instead,
+        which handles process HANDLEs.
+        """
+        if self._selector is None:
+            procs_by_sentinel = {
+                proc.sentinel: proc for proc in list(self._live_procs) if proc._popen
+            }
+            exited_procs = [
+                procs_by_sentinel[sentinel]
+                for sentinel in multiprocessing.connection.wait(
+                    list(procs_by_sentinel), timeout=0
+                )
+            ]
+        else:
+            # register workers started since the last call; copy the set, the
+            # pool's worker-handler thread adds respawned workers concurrently
+            for proc in list(self._live_procs - self._registered_procs):
+                if proc._popen:  # skip workers that have not been started yet
+                    self._selector.register(proc.sentinel, selectors.EVENT_READ, proc)
+                    self._registered_procs.add(proc)
+            exited_procs = [key.data for key, _ in self._selector.select(timeout=0)]
+
+        for proc in exited_procs:
+            exitcode = proc.exitcode
+            if exitcode is None:
+                # sentinel fired but the exit status is not available yet,
+                # e.g. the pool's worker handler is reaping the worker
+                # concurrently; keep it tracked and retry on the next call
+                time.sleep(0.001)  # avoid spinning while the status settles
+                continue
+            if self._selector is not None:
+                self._selector.unregister(proc.sentinel)
+                self._registered_procs.discard(proc)
+            self._live_procs.discard(proc)
+            if exitcode != 0:
                 return proc
-        self.processes = [p for p in self.processes if p.exitcode != 0]
+
+    def worker_sentinels(self):
+        """Returns the exit sentinels of all live (and already started) workers."""
+        return [proc.sentinel for proc in list(self._live_procs) if proc._popen]
+
+
+LOG_BATCH_SIZE = 50
+LOG_BATCH_FLUSH_INTERVAL = 0.25  # seconds
+
+
+class BatchingQueueHandler(QueueHandler):
+    """QueueHandler that accumulates records and ships them in one queue put.
+
+    Amortizes the per-record pickle + pipe cost of QueueHandler, which
+    dominates in workers that log at high rates.
+    """
+
+    def __init__(self, queue):
+        super().__init__(queue)
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def emit(self, record):
+        try:
+            self.buffer.append(self.prepare(record))
+            if (
+                len(self.buffer) >= LOG_BATCH_SIZE
+                or time.monotonic() - self.last_flush > LOG_BATCH_FLUSH_INTERVAL
+            ):
+                self.flushBuffer()
+        except Exception:
+            self.handleError(record)
+
+    def flushBuffer(self):
+        if self.buffer:
+            self.enqueue(self.buffer)
+            self.buffer = []
+        self.last_flush = time.monotonic()
+
+
+class BatchingQueueListener(QueueListener):
+    """QueueListener counterpart of BatchingQueueHandler that unpacks batches."""
+
+    def handle(self, records):
+        for record in records:
+            super().handle(record)
+
+
+_SHARED = {}
+
+
+class SharedRef:
+    """Reference to a payload registered with register_shared().
+
+    Passing a SharedRef as a job argument avoids re-pickling the payload on
+    every applyAsync call; the worker resolves it to the registered value.
+    """
+
+    __slots__ = ("name",)
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def register_shared(name: str, value):
+    """Registers a payload shared with the workers of JobPools created later.
+
+    Must be called before the JobPool is constructed. Under the fork start
+    method the payload is inherited copy-on-write for free; under spawn it is
+    pickled once per worker at initializer time instead of once per job.
+    """
+    _SHARED[name] = value
+
+
+def _resolve_shared_args(fargs):
+    return [_SHARED[arg.name] if isinstance(arg, SharedRef) else arg for arg in fargs]
+
+
+def _call_with_shared_args(f, fargs):
+    return f(*_resolve_shared_args(fargs))
+
+
+_FUNC_REGISTRY = {}
+
+
+def register_function(func):
+    """Registers func so that applyAsync submits a short string key instead of
+    re-pickling the callable on every call. Usable as a decorator.
+
+    Like register_shared, call it before the JobPool is constructed: fork
+    workers inherit the registry, spawn and forkserver workers receive it once
+    at initializer time.
+    """
+    key = f"{func.__module__}.{func.__qualname__}"
+    _FUNC_REGISTRY[key] = func
+    func._job_pool_key = key
+    return func
+
+
+def _dispatch_registered(key, fargs):
+    return _FUNC_REGISTRY[key](*_resolve_shared_args(fargs))
+
+
+def _run_chunk(f, chunk):
+    return [f(arg) for arg in chunk]
+
+
+_listener_lock = threading.Lock()
+_listener_queues = {}
+
+
+def _get_or_create_listener_queue(batch_logs: bool = False):
+    """Lazily creates a single log queue + listener per process and batch mode.
+
+    Nested workflows can construct many short-lived JobPools inside a worker
+    process; creating a QueueListener per JobPool would leak a listener thread
+    and a queue-reader thread each time.
+    """
+    with _listener_lock:
+        if batch_logs not in _listener_queues:
+            queue = multiprocessing.Queue()
+            listener_class = BatchingQueueListener if batch_logs else QueueListener
+            queue_listener = listener_class(queue, logger)
+            queue_listener.start()
+            atexit.register(queue_listener.stop)
+            _listener_queues[batch_logs] = queue
+        return _listener_queues[batch_logs]
 
 
 class AbnormalPoolTerminationError(Exception):
@@ -64,9 +265,16 @@ class JobPool:
         processes: int = 1,
         warningFilter: str = "default",
         queue: Optional[multiprocessing.Queue] = None,
-        timeout: int = 10000,
+        timeout: float = 10000,
         maxtasksperchild: Optional[int] = None,
         write_progress_to_logger: bool = False,
+        max_jobs_queued: int = 0,
+        batch_logs: bool = False,
+        backend: str = "mp",
+        blas_threads: Optional[int] = None,
+        start_method: Optional[str] = None,
+        initializer: Optional[Callable] = None,
+        initargs: tuple = (),
     ):
         """Creates a JobPool object
 
@@ -81,45 +289,236 @@ class JobPool:
             processes: number of processes. Defaults to 1.
             warningFilter: level of warnings (https://docs.python.org/3/library/warnings.html#warning-filter). Defaults to "default".
             queue: a multiprocessing.Queue object. If None, a new queue is automatically created. Defaults to None.
-            timeout: maximum time out for each job in seconds. Defaults to 10000 (~3 hours).
+            timeout: maximum time in seconds that checkPool waits without any job completing before raising a TimeoutError; the total runtime may exceed this as long as the pool keeps making progress. Defaults to 10000 (~3 hours).
             maxtasksperchild: number of jobs a process can execute before respawning a new process. If None, the number of jobs is unlimited. Default to None.
+            max_jobs_queued: maximum number of jobs in flight; applyAsync blocks until a job finishes once this limit is reached. If 0, the number of jobs is unlimited. Defaults to 0.
+            batch_logs: send log records from workers in batches instead of one pickle + pipe write per record. Only takes effect when JobPool creates its own queue, or when the supplied queue is read by a BatchingQueueListener. Defaults to False.
+            backend: "mp" for the NestablePool based on multiprocessing.pool.Pool, or "mpire" for an mpire.WorkerPool with non-daemonic workers. "mpire" is recommended when JobPool is itself invoked from inside another pool and has lower per-task overhead, but requires the optional mpire dependency and does not use the worker_init warning/logging plumbing. Defaults to "mp".
+            blas_threads: limit on the number of BLAS/OpenMP threads per worker, to prevent oversubscription when jobs use numpy/scipy. If None, the BLAS thread count is left untouched. Defaults to None.
+            start_method: multiprocessing start method for the workers ("fork", "spawn" or "forkserver"). "spawn" is recommended when the parent has a large heap, since forked workers accumulate copy-on-write page faults, at the cost of slower pool start-up. "forkserver" forks lean workers from a clean server process in milliseconds and is a good middle ground when many pools are created. If None, the platform default is used. Defaults to None.
+            initializer: callable run once in each worker after JobPool's own set-up, e.g. to pre-import hot modules; it runs again whenever maxtasksperchild respawns a worker. Defaults to None.
+            initargs: arguments passed to initializer. Defaults to ().
         """
+        self.backend = backend
+        self.processes = processes
         self.timeout = timeout
         self.maxtasksperchild = maxtasksperchild
         self.write_progress_to_logger = write_progress_to_logger
 
-        if not queue and multiprocessing.current_process().name != "MainProcess":
-            queue = multiprocessing.Queue()
-            queue_listener = QueueListener(queue, logger)
-            queue_listener.start()
-
-        self.pool = NestablePool(
-            processes,
-            worker_init,
-            initargs=(warningFilter, queue),
-            maxtasksperchild=self.maxtasksperchild,
+        # markJobDone runs in the pool's result-handler thread of this process,
+        # so a threading semaphore suffices for back-pressure (no IPC needed)
+        self.job_sem = (
+            threading.BoundedSemaphore(max_jobs_queued) if max_jobs_queued else None
         )
 
+        # self-pipe poked by markJobDone so that checkPool can sleep until a
+        # job completes or a worker dies, instead of waking up periodically;
+        # a socket pair rather than os.pipe() because sockets support
+        # non-blocking mode and multiprocessing.connection.wait on Windows
+        # too, where raw pipe fds do neither
+        self._wakeup_recv, self._wakeup_send = socket.socketpair()
+        self._wakeup_recv.setblocking(False)
+        self._wakeup_send.setblocking(False)
+
+        if not queue and multiprocessing.current_process().name != "MainProcess":
+            queue = _get_or_create_listener_queue(batch_logs)
+
+        if backend == "mpire":
+            try:
+                import mpire
+            except ImportError:
+                raise ImportError(
+                    "backend='mpire' requires the optional mpire dependency, "
+                    "install it with 'pip install job-pool[mpire]'"
+                ) from None
+            self.pool = mpire.WorkerPool(
+                n_jobs=processes,
+                daemon=False,
+                start_method=start_method or "fork",
+            )
+        elif backend == "mp":
+            # under fork the workers inherit _SHARED copy-on-write; only spawn
+            # and forkserver workers need the payloads pickled to them
+            effective_start_method = start_method or multiprocessing.get_start_method()
+            shared = _SHARED if effective_start_method != "fork" else None
+            func_registry = _FUNC_REGISTRY if effective_start_method != "fork" else None
+            self.pool = NestablePool(
+                processes,
+                worker_init,
+                initargs=(
+                    warningFilter,
+                    queue,
+                    batch_logs,
+                    shared,
+                    func_registry,
+                    blas_threads,
+                    initializer,
+                    initargs,
+                ),
+                maxtasksperchild=self.maxtasksperchild,
+                context=(
+                    multiprocessing.get_context(start_method) if start_method else None
+                ),
+            )
+        else:
+            raise ValueError(f"Unknown backend: {backend}, use 'mp' or 'mpire'")
+
         self.results = []
 
-    def applyAsync(self, f, fargs, *args, **kwargs):
-        r = self.pool.apply_async(f, fargs, *args, **kwargs)
+        # submission/completion counters so that checkPool can also wait for
+        # jobs submitted with collect=False; _num_done is only incremented
+        # from the pool's single result-handler thread
+        self._num_submitted = 0
+        self._num_done = 0
+
+    def applyAsync(
+        self,
+        f,
+        fargs,
+        *args,
+        callback=None,
+        error_callback=None,
+        collect: bool = True,
+        **kwargs,
+    ):
+        """Submits a job to the pool.
+
+        With collect=False the result is discarded as soon as the callbacks
+        have fired, so memory usage stays proportional to the number of jobs
+        in flight instead of the total number of jobs. checkPool still waits
+        for these jobs to finish, but their return values are not part of its
+        outputs and exceptions are only surfaced through error_callback.
+        """
+        if self.job_sem is not None:
+            self.job_sem.acquire()
+        key = getattr(f, "_job_pool_key", None)
+        if key is not None:
+            # registered functions travel as a short string key instead of a
+            # pickled callable; the worker-side dispatch resolves SharedRefs
+            f, fargs = _dispatch_registered, (key, list(fargs))
+        elif any(isinstance(arg, SharedRef) for arg in fargs):
+            f, fargs = _call_with_shared_args, (f, list(fargs))
+        r = self.pool.apply_async(
+            f,
+            fargs,
+            *args,
+            callback=functools.partial(self.markJobDone, callback),
+            error_callback=functools.partial(self.markJobDone, error_callback),
+            **kwargs,
+        )
+        self._num_submitted += 1
+        if collect:
+            self.results.append(r)
+
+    def markJobDone(self, callback, result):
+        self._num_done += 1
+        if self.job_sem is not None:
+            self.job_sem.release()
+        # a straggling callback can fire while stopPool tears the pipe down,
+        # so take a snapshot of the socket and swallow writes to a closed one
+        # alongside the usual buffer-full case
+        wakeup_send = self._wakeup_send
+        if wakeup_send is not None:
+            try:
+                wakeup_send.send(b"\0")
+            except OSError:
+                pass  # buffer is full of unread wake-up tokens, or already closed
+        if callback is not None:
+            callback(result)
+
+    def map_async_batch(self, f, args_iter, chunksize: Optional[int] = None):
+        """Submits all items of args_iter as one batched map_async call.
+
+        One pipe message carries chunksize tasks, unlike per-item applyAsync.
+        The batch counts as a single job towards max_jobs_queued and the
+        progress bar; checkPool splices its outputs in place, preserving
+        submission order.
+        """
+        if self.backend == "mpire":
+            # mpire.WorkerPool has no map_async and its imap signature
+            # differs; its own map already dispatches in chunks
+            raise ValueError(
+                "map_async_batch is not supported with backend='mpire', "
+                "use applyAsync instead"
+            )
+        fargs = list(args_iter)
+        if chunksize is None:
+            # same heuristic as multiprocessing.Pool.map
+            chunksize, extra = divmod(len(fargs), self.processes * 4)
+            if extra:
+                chunksize += 1
+        if self.job_sem is not None:
+            self.job_sem.acquire()
+        r = self.pool.map_async(
+            f,
+            fargs,
+            max(1, chunksize),
+            callback=functools.partial(self.markJobDone, None),
+            error_callback=functools.partial(self.markJobDone, None),
+        )
+        self._num_submitted += 1
         self.results.append(r)
 
-    def checkPool(self, printProgressEvery: int = -1):
+    def map(self, f, args_iter, chunksize: Optional[int] = None, ordered: bool = False):
+        """Runs f over args_iter and returns the outputs, like Pool.map.
+
+        Tasks are dispatched in chunks, so one pipe message carries chunksize
+        tasks instead of one; for many small jobs this is markedly faster than
+        per-job applyAsync. Outputs are in completion order unless
+        ordered=True. Terminates the pool when done, like checkPool.
+        """
+        if self.backend == "mpire":
+            # mpire's imap takes iterable_len, not chunksize, as its third
+            # argument and lacks the next(timeout) used for the dead-worker
+            # detection below; its own map already dispatches in chunks
+            raise ValueError(
+                "map is not supported with backend='mpire', use applyAsync instead"
+            )
+        fargs = list(args_iter)
+        if chunksize is None:
+            # same heuristic as multiprocessing.Pool.map
+            chunksize, extra = divmod(len(fargs), self.processes * 4)
+            if extra:
+                chunksize += 1
         try:
-            outputs = list()
+            outputs = []
             tqdm_out = None
             if self.write_progress_to_logger:
                 tqdm_out = TqdmToLogger(logger, level=logging.INFO)
-            for res in tqdm(
-                self.results,
+            imap = self.pool.imap if ordered else self.pool.imap_unordered
+            # chunk manually instead of passing chunksize to imap: with a
+            # chunksize > 1 Pool.imap hides the IMapIterator behind a
+            # flattening generator, and we need the iterator's next(timeout)
+            # to be able to notice dead workers below
+            chunksize = max(1, chunksize)
+            chunks = [fargs[i : i + chunksize] for i in range(0, len(fargs), chunksize)]
+            it = imap(functools.partial(_run_chunk, f), chunks)
+            progress_bar = tqdm(
+                total=len(fargs),
                 file=tqdm_out,
-                miniters=printProgressEvery,
                 maxinterval=float("inf"),
-            ):
-                self.checkForTerminatedProcess(res)
-                outputs.append(res.get())
+            )
+            last_progress_time = time.time()
+            num_chunks_done = 0
+            while num_chunks_done < len(chunks):
+                try:
+                    chunk_outputs = it.next(timeout=0.1)
+                except multiprocessing.TimeoutError:
+                    # same dead-worker detection and stall-based timeout as
+                    # checkPool; a crashed worker's chunk never arrives, so
+                    # the iterator times out and we check exit codes here
+                    if proc := self.pool.check_for_terminated_processes():
+                        raise AbnormalWorkerTerminationError(
+                            f"Caught abnormal exit of one of the workers: {proc}"
+                        )
+                    if time.time() - last_progress_time > self.timeout:
+                        raise TimeoutError
+                    continue
+                outputs.extend(chunk_outputs)
+                progress_bar.update(len(chunk_outputs))
+                last_progress_time = time.time()
+                num_chunks_done += 1
+            progress_bar.close()
             self.stopPool()
             return outputs
         except (KeyboardInterrupt, SystemExit) as e:
@@ -132,28 +531,176 @@ class JobPool:
             self.stopPool()
             raise AbnormalPoolTerminationError from None
 
-    def stopPool(self):
-        self.pool.terminate()
-        self.pool.join()
-
-    def checkForTerminatedProcess(self, res):
-        start_time = time.time()
-        while not res.ready():
-            if proc := self.pool.check_for_terminated_processes():
-                raise AbnormalWorkerTerminationError(
-                    f"Caught abnormal exit of one of the workers: {proc}"
-                )
+    def reset(self):
+        """Clears pending results and counters so the pool can run another batch.
 
-            # wait for one second before checking exit codes again
-            res.wait(timeout=1)
+        Together with checkPool(keepPoolAlive=True) this allows reusing one
+        pool for several submit/check rounds without paying worker start-up
+        cost again.
+        """
+        self.results.clear()
+        self._num_submitted = 0
+        self._num_done = 0
+        if self._wakeup_recv is not None:
+            try:
+                self._wakeup_recv.recv(2**16)
+            except BlockingIOError:
+                pass  # no stale wake-up tokens to drain
+
+    def checkPool(self, printProgressEvery: int = -1, keepPoolAlive: bool = False):
+        try:
+            outputs = [None] * len(self.results)
+            tqdm_out = None
+            if self.write_progress_to_logger:
+                tqdm_out = TqdmToLogger(logger, level=logging.INFO)
+            if printProgressEvery > 0:
+                # gate refreshes purely on the requested job count
+                miniters, mininterval = printProgressEvery, 0
+            else:
+                # cap time-based refreshes at twice a second
+                miniters, mininterval = 1, 0.5
+            progress_bar = tqdm(
+                total=self._num_submitted,
+                file=tqdm_out,
+                miniters=miniters,
+                mininterval=mininterval,
+                maxinterval=float("inf"),
+            )
+            pending = deque(enumerate(self.results))
+            last_progress_time = time.time()
+            num_done_seen = 0
+            num_updates_pending = 0
+            while pending or num_done_seen < self._num_submitted:
+                # one rotation through the pending deque, with the hot
+                # lookups bound to locals; completed jobs drop out, the rest
+                # are re-appended in order
+                popleft, append = pending.popleft, pending.append
+                for _ in range(len(pending)):
+                    idx, res = popleft()
+                    if res.ready():
+                        outputs[idx] = res.get()
+                    else:
+                        append((idx, res))
+
+                # fire-and-forget jobs (collect=False) only show up in the
+                # completion counter, so track progress through that;
+                # accumulate updates and hand them to tqdm in bulk once a
+                # full miniters worth of jobs has completed
+                num_done = self._num_done
+                if num_done > num_done_seen:
+                    num_updates_pending += num_done - num_done_seen
+                    num_done_seen = num_done
+                    last_progress_time = time.time()
+                    if num_updates_pending >= miniters:
+                        progress_bar.update(num_updates_pending)
+                        num_updates_pending = 0
+
+                # check worker exit codes once per scan, regardless of which
+                # job crashed or which jobs are still pending; mpire handles
+                # dead workers itself and raises from res.get()
+                if self.backend == "mp" and (
+                    proc := self.pool.check_for_terminated_processes()
+                ):
+                    raise AbnormalWorkerTerminationError(
+                        f"Caught abnormal exit of one of the workers: {proc}"
+                    )
+
+                if num_done_seen >= self._num_submitted:
+                    # all jobs are done according to the counter, the pending
+                    # results just have not been flagged ready yet (the
+                    # completion callback fires just before the ready event)
+                    time.sleep(0.001)
+                else:
+                    # a job only counts as timed out if no other job completed
+                    # in the meantime, i.e. the pool stopped making progress
+                    if time.time() - last_progress_time > self.timeout:
+                        raise TimeoutError
+                    self.waitForJobOrWorkerExit(last_progress_time)
+            if num_updates_pending:
+                progress_bar.update(num_updates_pending)
+            progress_bar.close()
+            if not keepPoolAlive:
+                self.stopPool()
+
+            # splice the output lists of batched submissions (map_async_batch)
+            # in place of their single result object
+            flattened = []
+            for res, output in zip(self.results, outputs):
+                if isinstance(res, multiprocessing.pool.MapResult):
+                    flattened.extend(output)
+                else:
+                    flattened.append(output)
+            return flattened
+        except (KeyboardInterrupt, SystemExit) as e:
+            logger.error(f"Caught {e.__class__.__name__}, terminating workers")
+            self.stopPool()
+            raise AbnormalPoolTerminationError from None
+        except Exception as e:
+            logger.error(f"Caught {e.__class__.__name__}. terminating workers")
+            logger.error(e, exc_info=1)
+            self.stopPool()
+            raise AbnormalPoolTerminationError from None
 
-            if time.time() - start_time > self.timeout:
-                raise TimeoutError
+    def waitForJobOrWorkerExit(self, last_progress_time):
+        """Sleeps until a job completes, a worker exits or the timeout expires.
 
+        Worker exits are signalled by the kernel through the process sentinels,
+        job completions through the self-pipe, so no periodic polling is needed.
+        """
+        remaining = self.timeout - (time.time() - last_progress_time)
+        sentinels = [self._wakeup_recv]
+        if self.backend == "mp":
+            sentinels += self.pool.worker_sentinels()
+        multiprocessing.connection.wait(sentinels, timeout=max(0.0, remaining))
+        try:
+            self._wakeup_recv.recv(2**16)
+        except BlockingIOError:
+            pass  # no wake-up tokens to drain
+
+    def stopPool(self):
+        self.pool.terminate()
+        if self.backend == "mp":
+            self.pool.join()
+        # close the self-pipe so repeated pool creation does not leak fds;
+        # guarded because checkPool calls stopPool on error paths even if the
+        # user already stopped the pool themselves
+        if self._wakeup_recv is not None:
+            self._wakeup_recv.close()
+            self._wakeup_send.close()
+            self._wakeup_recv = self._wakeup_send = None
+
+
+def worker_init(
+    warningFilter: str,
+    queue: Optional[multiprocessing.Queue] = None,
+    batch_logs: bool = False,
+    shared: Optional[dict] = None,
+    func_registry: Optional[dict] = None,
+    blas_threads: Optional[int] = None,
+    initializer: Optional[Callable] = None,
+    initargs: tuple = (),
+):
+    if blas_threads is not None:
+        # imported lazily: threadpoolctl probes all loaded BLAS/OpenMP
+        # libraries on import, which is not worth paying for when unused
+        from threadpoolctl import threadpool_limits
+
+        threadpool_limits(limits=blas_threads)
+
+    if shared:
+        _SHARED.update(shared)
+
+    if func_registry:
+        _FUNC_REGISTRY.update(func_registry)
 
-def worker_init(warningFilter: str, queue: Optional[multiprocessing.Queue] = None):
     if queue:
-        queueHandler = QueueHandler(queue)
+        if batch_logs:
+            queueHandler = BatchingQueueHandler(queue)
+            # make sure buffered records survive process exit, e.g. when
+            # maxtasksperchild respawns the worker
+            atexit.register(queueHandler.flushBuffer)
+        else:
+            queueHandler = QueueHandler(queue)
         logger = logging.getLogger()
         logger.setLevel(logging.INFO)
         logger.addHandler(queueHandler)
@@ -164,3 +711,6 @@ def worker_init(warningFilter: str, queue: Optional[multiprocessing.Queue] = Non
     # causes child processes to ignore SIGINT (interrupt) signal and lets main process handle
     # interrupts instead (https://noswap.com/blog/python-multiprocessing-keyboardinterrupt)
     signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    if initializer is not None:
+        initializer(*initargs)
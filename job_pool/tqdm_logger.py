@@ -18,9 +18,14 @@ class TqdmToLogger(io.StringIO):
         super(TqdmToLogger, self).__init__()
         self.logger = logger
         self.level = level or logging.INFO
+        self._last = ""
 
     def write(self, buf):
         self.buf = buf.strip("\r\n\t ")
 
     def flush(self):
-        self.logger.log(self.level, self.buf)
+        # skip handler dispatch for the empty carriage-return-only frames and
+        # unchanged status lines that tqdm emits on most refreshes
+        if self.buf and self.buf != self._last:
+            self.logger.log(self.level, self.buf)
+            self._last = self.buf
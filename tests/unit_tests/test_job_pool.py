@@ -1,14 +1,47 @@
+import gc
+import logging
+import multiprocessing
+import os
 import sys
 import time
 import pytest
 
-from job_pool import JobPool, AbnormalPoolTerminationError
+from job_pool import (
+    JobPool,
+    AbnormalPoolTerminationError,
+    BatchingQueueHandler,
+    BatchingQueueListener,
+    SharedRef,
+    register_function,
+    register_shared,
+)
+from job_pool.job_pool import LOG_BATCH_SIZE
 
 
+@register_function
 def add_one(i):
     return i + 1
 
 
+def add_offset(i, offset):
+    return i + offset
+
+
+@pytest.fixture(scope="module")
+def shared_pool():
+    """One pool for tests that leave the workers healthy, to amortize fork cost"""
+    pool = JobPool(4, timeout=10)
+    yield pool
+    pool.stopPool()
+
+
+@pytest.fixture
+def pool(shared_pool):
+    shared_pool.reset()
+    return shared_pool
+
+
+@register_function
 def exit_if_one(value):
     if value:
         sys.exit(123)
@@ -18,12 +51,100 @@ def exit_if_one(value):
 def test_add_one():
     """Tests that the results are in the correct order"""
     pool = JobPool(4)
+    pool.map_async_batch(add_one, range(20))
+    results = pool.checkPool()
+    assert results == list(range(1, 21))
+
+
+def test_max_jobs_queued():
+    """Tests that submission back-pressure still returns all results in order"""
+    pool = JobPool(4, max_jobs_queued=2)
     for i in range(20):
         pool.applyAsync(add_one, [i])
     results = pool.checkPool()
     assert results == list(range(1, 21))
 
 
+def test_shared_ref():
+    """Tests that SharedRef arguments resolve to the registered payload in workers"""
+    register_shared("offset", 100)
+    pool = JobPool(4)
+    for i in range(5):
+        pool.applyAsync(add_offset, [i, SharedRef("offset")])
+    results = pool.checkPool()
+    assert results == [100, 101, 102, 103, 104]
+
+
+def test_fire_and_forget(pool):
+    """Tests that jobs submitted with collect=False complete but return no results"""
+    for i in range(10):
+        pool.applyAsync(add_one, [i], collect=False)
+    results = pool.checkPool(keepPoolAlive=True)
+    assert results == []
+
+
+def test_start_method_spawn():
+    """Tests that results are returned correctly with spawned instead of forked workers"""
+    pool = JobPool(2, start_method="spawn")
+    for i in range(4):
+        pool.applyAsync(add_one, [i])
+    results = pool.checkPool()
+    assert results == [1, 2, 3, 4]
+
+
+def test_map():
+    """Tests that map returns all outputs, in submission order when ordered=True"""
+    pool = JobPool(4)
+    results = pool.map(add_one, range(20))
+    assert sorted(results) == list(range(1, 21))
+
+
+def test_map_ordered():
+    """Tests that map with ordered=True preserves submission order"""
+    pool = JobPool(4)
+    results = pool.map(add_one, range(20), ordered=True)
+    assert results == list(range(1, 21))
+
+
+def test_no_fd_leak():
+    """Tests that repeated pool lifecycles do not leak the self-pipe fds"""
+    if not os.path.exists("/proc/self/fd"):
+        pytest.skip("requires /proc to count open fds")
+    JobPool(2).stopPool()  # warm up lazily created resources
+    gc.collect()
+    num_fds_before = len(os.listdir("/proc/self/fd"))
+    for _ in range(5):
+        pool = JobPool(2)
+        pool.applyAsync(add_one, [1])
+        pool.checkPool()
+        pool.stopPool()  # double stop must not raise on the closed pipe
+    del pool
+    # the pool's own queue fds are released at garbage collection; only the
+    # self-pipe fds used to leak past it
+    gc.collect()
+    assert len(os.listdir("/proc/self/fd")) <= num_fds_before
+
+
+def test_map_exited_process():
+    """Tests that map detects a worker that exited abnormally instead of hanging"""
+    pool = JobPool(4, timeout=10)
+    with pytest.raises(AbnormalPoolTerminationError):
+        pool.map(exit_if_one, [0, 0, 1, 0, 0])
+
+
+@pytest.mark.skipif(
+    "forkserver" not in multiprocessing.get_all_start_methods(),
+    reason="forkserver start method is not available on this platform",
+)
+def test_start_method_forkserver():
+    """Tests that results are returned correctly with forkserver workers"""
+    pool = JobPool(2, start_method="forkserver")
+    for i in range(4):
+        pool.applyAsync(add_one, [i])
+    results = pool.checkPool()
+    assert results == [1, 2, 3, 4]
+
+
 def test_exited_process():
     pool = JobPool(4, timeout=10)
     for value in [0, 0, 0, 0, 0, 1, 0, 0, 0, 0, 0, 0]:
@@ -33,25 +154,91 @@ def test_exited_process():
         _ = pool.checkPool()
 
 
-def test_no_exited_process():
-    pool = JobPool(4, timeout=10)
+def test_no_exited_process(pool):
     for value in [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]:
         pool.applyAsync(exit_if_one, [value])
 
-    results = pool.checkPool()
+    results = pool.checkPool(keepPoolAlive=True)
 
     assert results == [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
 
 
+def test_batch_logs():
+    """Tests that batched records make it through the handler/listener pair intact"""
+    received = []
+
+    class Collector(logging.Handler):
+        def emit(self, record):
+            received.append(record.getMessage())
+
+    log_queue = multiprocessing.Queue()
+    listener = BatchingQueueListener(log_queue, Collector())
+    listener.start()
+    handler = BatchingQueueHandler(log_queue)
+    batch_logger = logging.getLogger("test_batch_logs")
+    batch_logger.setLevel(logging.INFO)
+    batch_logger.addHandler(handler)
+    try:
+        # one full batch flushed at LOG_BATCH_SIZE, plus one buffered record
+        # that only the explicit flush (as registered via atexit in workers)
+        # pushes out
+        for i in range(LOG_BATCH_SIZE + 1):
+            batch_logger.info("message %d", i)
+        handler.flushBuffer()
+    finally:
+        batch_logger.removeHandler(handler)
+        listener.stop()  # drains the queue before joining the listener thread
+
+    assert received == [f"message {i}" for i in range(LOG_BATCH_SIZE + 1)]
+
+
+def test_mpire_backend_missing_dependency():
+    """Tests the install hint raised when backend="mpire" is used without mpire"""
+    try:
+        import mpire  # noqa: F401
+    except ImportError:
+        with pytest.raises(ImportError, match=r"pip install job-pool\[mpire\]"):
+            JobPool(2, backend="mpire")
+    else:
+        pytest.skip("mpire is installed")
+
+
+def test_mpire_backend():
+    """Tests that the mpire backend returns results in the correct order"""
+    pytest.importorskip("mpire")
+    pool = JobPool(2, backend="mpire")
+    for i in range(8):
+        pool.applyAsync(add_one, [i])
+    results = pool.checkPool()
+    assert results == list(range(1, 9))
+
+
+def test_mpire_backend_map_not_supported():
+    """Tests that map and map_async_batch reject the mpire backend with a clear error"""
+    pytest.importorskip("mpire")
+    pool = JobPool(2, backend="mpire")
+    with pytest.raises(ValueError, match="backend='mpire'"):
+        pool.map(add_one, range(4))
+    with pytest.raises(ValueError, match="backend='mpire'"):
+        pool.map_async_batch(add_one, range(4))
+    pool.stopPool()
+
+
+# scale factor for the sleep-based tests; only the sleep/timeout ratio matters,
+# so CI can run a slower (more robust) variant by raising this
+TIME_SCALE = float(os.environ.get("JOBPOOL_TEST_TIME_SCALE", "1.0"))
+
+
+@register_function
 def sleep_and_return(value):
-    time.sleep(value)
+    time.sleep(value * TIME_SCALE)
     return value
 
 
 def test_timeout():
     """Tests that TimeoutError is triggered if one of the jobs exceeds timeout"""
-    pool = JobPool(4, timeout=2)
-    for value in [0, 0, 0, 0, 0, 3, 0, 0, 0, 0, 0, 0]:
+    pool = JobPool(4, timeout=0.3 * TIME_SCALE)
+    for value in [0, 0, 0, 0, 0, 1.5, 0, 0, 0, 0, 0, 0]:
         pool.applyAsync(sleep_and_return, [value])
 
     with pytest.raises(AbnormalPoolTerminationError):
@@ -60,20 +247,20 @@ def test_timeout():
 
 def test_no_timeout():
     """Tests that each job finishes within timeout, but total time is allowed to exceed timeout"""
-    pool = JobPool(4, timeout=2)
-    for value in [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]:
+    pool = JobPool(4, timeout=0.5 * TIME_SCALE)
+    values = [0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1, 0.1]
+    for value in values:
         pool.applyAsync(sleep_and_return, [value])
 
     results = pool.checkPool()
 
-    assert results == [1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1, 1]
+    assert results == values
 
 
 def test_maxtasksperchild():
     """Tests that each job finishes within timeout, but total time is allowed to exceed timeout"""
     pool = JobPool(4, maxtasksperchild=2)
-    for value in [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]:
-        pool.applyAsync(add_one, [value])
+    pool.map_async_batch(add_one, [0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0])
 
     results = pool.checkPool()
 